@@ -1,7 +1,7 @@
 import logging
 import time
 from collections import deque
-from typing import NoReturn
+from typing import Awaitable, Callable, NoReturn
 
 from config import CONFIG
 from enums import Event, DeclineReason
@@ -19,27 +19,21 @@ class GameManager:
         self.current_games: dict[str, Game] = {}
         self.challenge_queue: deque[str] = deque()
         self.last_event_time: float = time.monotonic()
+        self.event_handlers: dict[str, Callable[[dict], Awaitable[None]]] = {
+            Event.PING.value: self.on_ping,
+            Event.GAME_START.value: self.on_game_start,
+            Event.GAME_FINISH.value: self.on_game_finish,
+            Event.CHALLENGE.value: self.on_challenge,
+            Event.CHALLENGE_CANCELED.value: self.on_challenge_canceled,
+        }
 
     async def watch_event_stream(self) -> NoReturn:
+        get_handler = self.event_handlers.get
         async for event in self.li.event_stream():
-            event_type = Event(event["type"])
-
-            if event_type == Event.PING:
-                await self.on_ping()
-
-            elif event_type == Event.GAME_START:
-                await self.on_game_start(event)
-
-            elif event_type == Event.GAME_FINISH:
-                await self.on_game_finish(event)
-
-            elif event_type == Event.CHALLENGE:
-                await self.on_challenge(event)
-
-            elif event_type == Event.CHALLENGE_CANCELED:
-                self.on_challenge_canceled(event)
+            if handler := get_handler(event["type"]):
+                await handler(event)
 
-    async def on_ping(self) -> None:
+    async def on_ping(self, event: dict) -> None:
         self.clean_games()
         if self.should_create_challenge():
             self.last_event_time = time.monotonic()
@@ -113,7 +107,7 @@ class GameManager:
             f"Games: {len(self.current_games)}. Challenges: {len(self.challenge_queue)}."
         )
 
-    def on_challenge_canceled(self, event: dict) -> None:
+    async def on_challenge_canceled(self, event: dict) -> None:
         self.last_event_time = time.monotonic()
         challenge_id = event["challenge"]["id"]
         logger.info(f"{challenge_id} -- Challenge canceled.")
@@ -1,93 +1,209 @@
 import asyncio
-import json
 import logging
 import random
+import sys
+import time
 from typing import AsyncIterator
+from urllib.parse import urlencode
 
-import backoff
 import chess
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    import json as orjson
+
 from config import CONFIG
 from enums import DeclineReason
 
 logger = logging.getLogger(__name__)
 
+# The one AsyncClient (and connection pool) for the process, set by Lichess.create().
+_CLIENT: httpx.AsyncClient | None = None
+
+# Shared by every stream for keepalive lines; consumers must not mutate it.
+_PING_EVENT: dict = {"type": "ping"}
+
+_DRAW_QUERY: dict[bool, str] = {
+    True: "?offeringDraw=true",
+    False: "?offeringDraw=false",
+}
+
+_FORM_HEADERS: dict[str, str] = {"Content-Type": "application/x-www-form-urlencoded"}
+
+_DECLINE_BODIES: dict[DeclineReason, bytes] = {
+    reason: urlencode({"reason": reason.value}).encode() for reason in DeclineReason
+}
+
+_BOT_PARSE_BATCH_SIZE = 64
+
+_rng = random.Random()
 
-class Lichess:
-    def __init__(self) -> None:
-        headers = {
-            "Authorization": f"Bearer {CONFIG['token']}",
-        }
-        user_info = httpx.get("https://lichess.org/api/account", headers=headers).json()
-        headers["User-Agent"] = f"asyncLio-bot user:{user_info['username']}"
 
+async def _aiter_ndjson(
+    response: httpx.Response, buf: bytearray
+) -> AsyncIterator[bytearray]:
+    # Split the body on raw newlines ourselves so lines stay bytes until orjson parses them,
+    # skipping the str decode and line splitting done by aiter_lines().
+    # The caller owns buf so it can be reused across reconnects; drop any partial line left by the last one.
+    buf.clear()
+    async for chunk in response.aiter_bytes():
+        buf.extend(chunk)
+        while (newline := buf.find(b"\n")) != -1:
+            line = buf[:newline]
+            del buf[: newline + 1]
+            yield line
+    if buf:
+        yield bytes(buf)
+
+
+def _stream_retry_delay(failures: int) -> float:
+    # Jittered exponential backoff for reconnecting streams, capped at 30s.
+    # Cap the exponent too, so a long outage can't overflow the float conversion.
+    return min(_rng.uniform(0.5, 3.0) * 2 ** min(failures, 6), 30.0)
+
+
+def get_client() -> httpx.AsyncClient:
+    if _CLIENT is None:
+        raise RuntimeError("No Lichess client has been created.")
+    return _CLIENT
+
+
+class Lichess:
+    def __init__(self, client: httpx.AsyncClient, user_info: dict) -> None:
+        self.client: httpx.AsyncClient = client
         self.username: str = user_info["username"]
         self.title: str = user_info.get("title", "")
-        self.client: httpx.AsyncClient = httpx.AsyncClient(
-            base_url="https://lichess.org", headers=headers, timeout=10,
+        self._challenge_body: bytes = urlencode(
+            {
+                "rated": str(CONFIG["matchmaking"]["rated"]).lower(),
+                "variant": CONFIG["matchmaking"]["variant"],
+                "color": "random",
+            }
+        ).encode()
+
+    @classmethod
+    async def create(cls) -> "Lichess":
+        global _CLIENT
+        if _CLIENT is not None:
+            raise RuntimeError("A Lichess client already exists; use get_client().")
+
+        client = httpx.AsyncClient(
+            base_url="https://lichess.org",
+            headers={"Authorization": f"Bearer {CONFIG['token']}"},
+            timeout=10,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=1000,
+                max_keepalive_connections=100,
+                keepalive_expiry=75,
+            ),
         )
+        try:
+            user_info = cls._json(await client.get("/api/account"))
+            client.headers["User-Agent"] = f"asyncLio-bot user:{user_info['username']}"
+        except BaseException:
+            await client.aclose()
+            raise
+
+        _CLIENT = client
+        return cls(client, user_info)
+
+    async def aclose(self) -> None:
+        global _CLIENT
+        await self.client.aclose()
+        if _CLIENT is self.client:
+            _CLIENT = None
 
     @property
     def me(self):
         return f"{self.title} {self.username}"
 
-    @backoff.on_exception(
-        backoff.constant,
-        httpx.RequestError,  # non-HTTP status errors
-        max_time=60,
-        logger=logger,
-        backoff_log_level=logging.WARNING,
-        giveup_log_level=logging.ERROR,
-        raise_on_giveup=False,
-    )
-    @backoff.on_predicate(
-        backoff.expo,
-        lambda response: response.status_code >= 500,
-        max_time=300,
-        logger=logger,
-        backoff_log_level=logging.WARNING,
-        giveup_log_level=logging.ERROR,
-    )
-    async def post(self, endpoint: str, **kwargs) -> httpx.Response:
-        return await self.client.post(endpoint, **kwargs)
+    async def post(self, endpoint: str, **kwargs) -> httpx.Response | None:
+        # Retry connection errors every second for up to a minute, and 5xx responses
+        # with exponential backoff for up to five minutes.
+        start_time = time.monotonic()
+        delay = 1.0
+        while True:
+            try:
+                response = await self.client.post(endpoint, **kwargs)
+            except httpx.RequestError as e:
+                if time.monotonic() - start_time >= 60:
+                    logger.error(f"Giving up on {endpoint} ({type(e).__name__}: {e})")
+                    return None
+                logger.warning(f"Retrying {endpoint} in 1.0s ({type(e).__name__}: {e})")
+                await asyncio.sleep(1)
+                continue
+
+            if response.status_code < 500:
+                return response
+
+            if time.monotonic() - start_time >= 300:
+                logger.error(f"Giving up on {endpoint} (HTTP {response.status_code})")
+                return response
+            logger.warning(
+                f"Retrying {endpoint} in {delay:.1f}s (HTTP {response.status_code})"
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    @staticmethod
+    def _json(response: httpx.Response) -> dict:
+        return orjson.loads(response.content)
+
+    @staticmethod
+    def _ok(response: httpx.Response | None) -> bool:
+        # post() returns None once it gives up on connection errors.
+        return response is not None and response.is_success
 
     async def event_stream(self) -> AsyncIterator[dict]:
+        buf = bytearray()
+        failures = 0
         while True:
             try:
                 async with self.client.stream("GET", "/api/stream/event") as response:
                     response.raise_for_status()
-                    async for line in response.aiter_lines():
+                    failures = 0
+                    async for line in _aiter_ndjson(response, buf):
                         if line.strip():
-                            event = json.loads(line)
-                            logger.debug(f"Event: {event}")
+                            event = orjson.loads(line)
+                            # Parsed strings are fresh objects; interning lets type lookups match by identity.
+                            event["type"] = sys.intern(event["type"])
+                            logger.debug("Event: %s", event)
                         else:
-                            event = {"type": "ping"}
+                            event = _PING_EVENT
                         yield event
             except Exception as e:
-                sleep_time = random.random()
+                sleep_time = _stream_retry_delay(failures)
+                failures += 1
                 logger.warning(
                     f"Pausing event stream for {sleep_time:.1f}s ({type(e).__name__}: {e})"
                 )
                 await asyncio.sleep(sleep_time)
 
     async def game_stream(self, game_id: str) -> AsyncIterator[dict]:
+        buf = bytearray()
+        failures = 0
         while True:
             try:
                 async with self.client.stream(
                     "GET", f"/api/bot/game/stream/{game_id}"
                 ) as response:
                     response.raise_for_status()
-                    async for line in response.aiter_lines():
+                    failures = 0
+                    async for line in _aiter_ndjson(response, buf):
                         if line.strip():
-                            event = json.loads(line)
-                            logger.debug(f"Game event: {event}")
+                            event = orjson.loads(line)
+                            event["type"] = sys.intern(event["type"])
+                            logger.debug("Game event: %s", event)
                         else:
-                            event = {"type": "ping"}
+                            event = _PING_EVENT
                         yield event
                 return
             except Exception as e:
-                sleep_time = random.random()
+                sleep_time = _stream_retry_delay(failures)
+                failures += 1
                 logger.warning(
                     f"{game_id} -- Pausing game stream for {sleep_time:.1f}s ({type(e).__name__}: {e})"
                 )
@@ -97,52 +213,61 @@ class Lichess:
         try:
             async with self.client.stream("GET", "/api/bot/online") as response:
                 response.raise_for_status()
-                async for line in response.aiter_lines():
-                    bot = json.loads(line)
-                    yield bot
+                # The online bot list can be thousands of lines; give other tasks a turn between batches.
+                num_lines = 0
+                async for line in _aiter_ndjson(response, bytearray()):
+                    if not line.strip():
+                        continue
+                    yield orjson.loads(line)
+                    num_lines += 1
+                    if num_lines % _BOT_PARSE_BATCH_SIZE == 0:
+                        await asyncio.sleep(0)
         except Exception as e:
             logger.warning(f"Stopping bot stream ({type(e).__name__}: {e})")
 
-    async def accept_challenge(self, challenge_id: str) -> None:
-        await self.post(f"/api/challenge/{challenge_id}/accept")
+    async def accept_challenge(self, challenge_id: str) -> bool:
+        return self._ok(await self.post(f"/api/challenge/{challenge_id}/accept"))
 
     async def decline_challenge(
         self, challenge_id: str, *, reason: DeclineReason = DeclineReason.GENERIC
-    ) -> None:
-        await self.post(
-            f"/api/challenge/{challenge_id}/decline", data={"reason": reason.value}
+    ) -> bool:
+        return self._ok(
+            await self.post(
+                f"/api/challenge/{challenge_id}/decline",
+                content=_DECLINE_BODIES[reason],
+                headers=_FORM_HEADERS,
+            )
         )
 
-    async def cancel_challenge(self, challenge_id: str) -> None:
-        await self.post(f"/api/challenge/{challenge_id}/cancel")
+    async def cancel_challenge(self, challenge_id: str) -> bool:
+        return self._ok(await self.post(f"/api/challenge/{challenge_id}/cancel"))
 
-    async def abort_game(self, game_id: str) -> None:
-        await self.post(f"/api/bot/game/{game_id}/abort")
+    async def abort_game(self, game_id: str) -> bool:
+        return self._ok(await self.post(f"/api/bot/game/{game_id}/abort"))
 
-    async def resign_game(self, game_id: str) -> None:
-        await self.post(f"/api/bot/game/{game_id}/resign")
+    async def resign_game(self, game_id: str) -> bool:
+        return self._ok(await self.post(f"/api/bot/game/{game_id}/resign"))
 
-    async def upgrade_account(self) -> None:
-        await self.post("/api/bot/account/upgrade")
+    async def upgrade_account(self) -> bool:
+        return self._ok(await self.post("/api/bot/account/upgrade"))
 
     async def make_move(
         self, game_id: str, move: chess.Move, *, offer_draw: bool = False
-    ) -> None:
-        await self.post(
-            f"/api/bot/game/{game_id}/move/{move.uci()}",
-            params={"offeringDraw": str(offer_draw).lower()},
+    ) -> bool:
+        return self._ok(
+            await self.post(
+                f"/api/bot/game/{game_id}/move/{move.uci()}{_DRAW_QUERY[offer_draw]}"
+            )
         )
 
     async def create_challenge(
         self, opponent: str, initial_time: int, increment: int = 0
-    ) -> None:
-        await self.post(
-            f"/api/challenge/{opponent}",
-            data={
-                "rated": str(CONFIG["matchmaking"]["rated"]).lower(),
-                "clock.limit": initial_time,
-                "clock.increment": increment,
-                "variant": CONFIG["matchmaking"]["variant"],
-                "color": "random",
-            },
+    ) -> bool:
+        return self._ok(
+            await self.post(
+                f"/api/challenge/{opponent}",
+                content=self._challenge_body
+                + f"&clock.limit={initial_time}&clock.increment={increment}".encode(),
+                headers=_FORM_HEADERS,
+            )
         )
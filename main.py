@@ -1,6 +1,7 @@
 import argparse
 import asyncio
 import logging
+import signal
 from typing import NoReturn
 
 import chess.engine
@@ -31,9 +32,13 @@ async def main(args: argparse.Namespace) -> NoReturn:
         handlers=logging_handlers,
     )
 
+    # Start new tasks eagerly so ones that finish without suspending skip a trip through the loop (Python 3.12+).
+    if eager_task_factory := getattr(asyncio, "eager_task_factory", None):
+        asyncio.get_running_loop().set_task_factory(eager_task_factory)
+
     print(LOGO)
 
-    li = Lichess()
+    li = await Lichess.create()
 
     if args.upgrade:
         if li.title == "BOT":
@@ -51,10 +56,18 @@ async def main(args: argparse.Namespace) -> NoReturn:
 
     logger.info(f"Logged in as {li.me}.")
 
+    # Cancel on SIGTERM so the client is closed below (signal handlers are unavailable on Windows).
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, asyncio.current_task().cancel
+        )
+    except NotImplementedError:
+        pass
+
     try:
         await GameManager(li).watch_event_stream()
     finally:
-        await li.client.aclose()
+        await li.aclose()
 
 
 if __name__ == "__main__":
@@ -67,5 +80,15 @@ if __name__ == "__main__":
         "--verbose", "-v", action="store_true", help="Make output more verbose."
     )
 
-    asyncio.set_event_loop_policy(chess.engine.EventLoopPolicy())
-    asyncio.run(main(parser.parse_args()))
+    # uvloop handles engine subprocesses itself, so python-chess' policy is only needed without it.
+    try:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        asyncio.set_event_loop_policy(chess.engine.EventLoopPolicy())
+    # SIGTERM cancels main(); treat that as a normal shutdown rather than an error.
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except asyncio.CancelledError:
+        logger.info("Shutting down.")